@@ -158,6 +158,9 @@ replace the current list of jobs with the list provided by `jobs()` as follows
             parca_scrape_config.append(job)
         ...
 
+If the jobs are only iterated over once, as above, `iter_jobs()` yields the same scrape jobs
+without first collecting them into a list.
+
 ## Relation Data
 
 Units of profiles provider charms advertise their names and addresses over unit relation data using
@@ -167,12 +170,14 @@ eponymous information.
 
 """  # noqa: W505
 
+import copy
+import functools
 import ipaddress
 import json
 import logging
 import socket
 from cosl import JujuTopology
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from ops.model import Relation
 
 import ops
@@ -187,20 +192,28 @@ LIBAPI = 0
 # to 0 if you are raising the major API version
 LIBPATCH = 4
 
+# NOTE: local fork of upstream LIBPATCH 4, excluded from charm-libs in charmcraft.yaml.
+
 
 logger = logging.getLogger(__name__)
 
 
-ALLOWED_KEYS = {
-    "job_name",
-    "static_configs",
-    "scrape_interval",
-    "scrape_timeout",
-    "scheme",
-    "profiling_config",
-    "tls_config",
+ALLOWED_KEYS = frozenset(
+    {
+        "job_name",
+        "static_configs",
+        "scrape_interval",
+        "scrape_timeout",
+        "scheme",
+        "profiling_config",
+        "tls_config",
+    }
+)
+# immutable template of the default static configs; fresh lists are built from it on use
+_DEFAULT_STATIC_CONFIGS = ({"targets": ("*:80",)},)
+DEFAULT_JOB = {
+    "static_configs": [{"targets": list(config["targets"])} for config in _DEFAULT_STATIC_CONFIGS]
 }
-DEFAULT_JOB = {"static_configs": [{"targets": ["*:80"]}]}
 DEFAULT_RELATION_NAME = "profiling-endpoint"
 RELATION_INTERFACE_NAME = "parca_scrape"
 
@@ -285,11 +298,11 @@ def _validate_relation_by_interface_and_direction(
             via `relation_name` argument does not have the same role as specified
             via the `expected_relation_role` argument.
     """
-    if relation_name not in charm.meta.relations:
+    meta = charm.meta
+    relation = meta.relations.get(relation_name)
+    if relation is None:
         raise RelationNotFoundError(relation_name)
 
-    relation = charm.meta.relations[relation_name]
-
     actual_relation_interface = relation.interface_name
     if actual_relation_interface != expected_relation_interface:
         raise RelationInterfaceMismatchError(
@@ -297,12 +310,12 @@ def _validate_relation_by_interface_and_direction(
         )
 
     if expected_relation_role == ops.RelationRole.provides:
-        if relation_name not in charm.meta.provides:
+        if relation_name not in meta.provides:
             raise ops.RelationRoleMismatchError(
                 relation_name, ops.RelationRole.provides, ops.RelationRole.requires
             )
     elif expected_relation_role == ops.RelationRole.requires:
-        if relation_name not in charm.meta.requires:
+        if relation_name not in meta.requires:
             raise ops.RelationRoleMismatchError(
                 relation_name, ops.RelationRole.requires, ops.RelationRole.provides
             )
@@ -325,11 +338,30 @@ def _sanitize_scrape_configuration(job) -> dict:
     Returns:
         a dictionary containing a sanitized job specification.
     """
-    sanitized_job = DEFAULT_JOB.copy()
-    sanitized_job.update({key: value for key, value in job.items() if key in ALLOWED_KEYS})
+    sanitized_job = {key: value for key, value in job.items() if key in ALLOWED_KEYS}
+    if "static_configs" not in sanitized_job:
+        sanitized_job["static_configs"] = [
+            {"targets": list(config["targets"])} for config in _DEFAULT_STATIC_CONFIGS
+        ]
     return sanitized_job
 
 
+def _update_relation_data(databag, data: Dict[str, str]):
+    """Write only those items of `data` whose values differ from the ones in `databag`.
+
+    Some ops releases run one relation-set per key in `RelationDataContent.update()`, whether or
+    not the value changed, so unchanged keys are dropped before writing. An empty value matches
+    an absent key, because writing one deletes the key.
+
+    Args:
+        databag: the `ops.RelationDataContent` to write to.
+        data: the keys and values to publish.
+    """
+    changed = {key: value for key, value in data.items() if databag.get(key, "") != value}
+    if changed:
+        databag.update(changed)
+
+
 class ProviderTopology(JujuTopology):
     """Class for initializing topology information for ProfilingEndpointProvider."""
 
@@ -393,6 +425,8 @@ class ProfilingEndpointConsumer(ops.Object):
         super().__init__(charm, relation_name)
         self._charm = charm
         self._relation_name = relation_name
+        # maps relation ids to the inputs and result of the last `_static_scrape_config` call
+        self._jobs_cache: Dict[int, Tuple[tuple, list]] = {}
         events = self._charm.on[relation_name]
         self.framework.observe(
             events.relation_changed, self.on_profiling_provider_relation_changed
@@ -431,18 +465,40 @@ class ProfilingEndpointConsumer(ops.Object):
     def jobs(self) -> list:
         """Fetch the list of scrape jobs.
 
+        Job names must be unique, so any job whose name was already used by a previous job is
+        logged and skipped. This includes a provider's second unnamed job, since both are named
+        after the provider's topology.
+
         Returns:
             A list consisting of all the static scrape configurations for each related
             `ProfilingEndpointProvider` that has specified its scrape targets.
         """
-        scrape_jobs = []
+        return list(self.iter_jobs())
 
-        for relation in self._charm.model.relations[self._relation_name]:
-            static_scrape_jobs = self._static_scrape_config(relation)
-            if static_scrape_jobs:
-                scrape_jobs.extend(static_scrape_jobs)
+    def iter_jobs(self) -> Iterator[dict]:
+        """Iterate over the scrape jobs, one relation at a time.
 
-        return scrape_jobs
+        Job names must be unique, so any job whose name was already used by a previous job is
+        logged and skipped.
+
+        Yields:
+            The static scrape configuration of each job of each related
+            `ProfilingEndpointProvider` that has specified its scrape targets.
+        """
+        job_names = set()
+
+        for relation in self._charm.model.relations[self._relation_name]:
+            for job in self._static_scrape_config(relation):
+                job_name = job.get("job_name")
+                if job_name in job_names:
+                    logger.warning(
+                        "skipping duplicate scrape job %r from relation %s", job_name, relation.id
+                    )
+                    continue
+                if job_name:
+                    job_names.add(job_name)
+                # the per-relation jobs are cached, so never hand out the cached objects
+                yield copy.deepcopy(job)
 
     def _static_scrape_config(self, relation) -> list:
         """Generate the static scrape configuration for a single relation.
@@ -455,36 +511,67 @@ class ProfilingEndpointConsumer(ops.Object):
 
         Returns:
             A list (possibly empty) of scrape jobs. Each job is a valid Parca scrape configuration
-            for that job, represented as a Python dictionary.
+            for that job, represented as a Python dictionary. The list is shared with later calls
+            for as long as the relation data is unchanged, so it must be treated as read-only.
         """
         if not relation.units:
             return []
 
-        scrape_jobs = json.loads(relation.data[relation.app].get("scrape_jobs", "[]"))
+        app_data = relation.data[relation.app]
+        raw_scrape_jobs = app_data.get("scrape_jobs")
+        raw_scrape_metadata = app_data.get("scrape_metadata")
+        hosts = self._relation_hosts(relation)
+
+        # the scrape jobs depend only on the application databag and the unit addresses
+        fingerprint = (raw_scrape_jobs, raw_scrape_metadata, tuple(sorted(hosts.items())))
+        cached = self._jobs_cache.get(relation.id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        scrape_jobs = self._labeled_static_scrape_jobs(raw_scrape_jobs, raw_scrape_metadata, hosts)
+        self._jobs_cache[relation.id] = (fingerprint, scrape_jobs)
+        return scrape_jobs
+
+    def _labeled_static_scrape_jobs(
+        self,
+        raw_scrape_jobs: Optional[str],
+        raw_scrape_metadata: Optional[str],
+        hosts: dict,
+    ) -> list:
+        """Parse and label the scrape jobs published over a single relation.
+
+        Args:
+            raw_scrape_jobs: the `scrape_jobs` application databag value, if any.
+            raw_scrape_metadata: the `scrape_metadata` application databag value, if any.
+            hosts: a dictionary mapping unit names to unit addresses for the relation.
+
+        Returns:
+            A list (possibly empty) of scrape jobs, labeled with Juju topology if the relation
+            provides `scrape_metadata`.
+        """
+        scrape_jobs = json.loads(raw_scrape_jobs) if raw_scrape_jobs else []
 
         if not scrape_jobs:
             return []
 
-        scrape_metadata = json.loads(relation.data[relation.app].get("scrape_metadata", "{}"))
+        scrape_metadata = json.loads(raw_scrape_metadata) if raw_scrape_metadata else {}
 
         if not scrape_metadata:
             return scrape_jobs
 
         job_name_prefix = JujuTopology.from_dict(scrape_metadata).identifier
+        # the topology labels are the same for every job, static config and host of a relation
+        topology_labels = ProviderTopology.from_dict(scrape_metadata).label_matcher_dict
 
-        hosts = self._relation_hosts(relation)
-
-        labeled_job_configs = []
-        for job in scrape_jobs:
-            config = self._labeled_static_job_config(
+        return [
+            self._labeled_static_job_config(
                 _sanitize_scrape_configuration(job),
                 job_name_prefix,
                 hosts,
-                scrape_metadata,
+                topology_labels,
             )
-            labeled_job_configs.append(config)
-
-        return labeled_job_configs
+            for job in scrape_jobs
+        ]
 
     def _relation_hosts(self, relation) -> dict:
         """Fetch unit names and address of all profiling provider units for a single relation.
@@ -498,18 +585,19 @@ class ProfilingEndpointConsumer(ops.Object):
         """
         hosts = {}
         for unit in relation.units:
+            unit_data = relation.data[unit]
             # TODO deprecate and remove unit.name
-            unit_name = relation.data[unit].get("parca_scrape_unit_name") or unit.name
+            unit_name = unit_data.get("parca_scrape_unit_name") or unit.name
             # TODO deprecate and remove "parca_scrape_host"
-            unit_address = relation.data[unit].get("parca_scrape_unit_address") or relation.data[
-                unit
-            ].get("parca_scrape_host")
+            unit_address = unit_data.get("parca_scrape_unit_address") or unit_data.get(
+                "parca_scrape_host"
+            )
             if unit_name and unit_address:
-                hosts.update({unit_name: unit_address})
+                hosts[unit_name] = unit_address
 
         return hosts
 
-    def _labeled_static_job_config(self, job, job_name_prefix, hosts, scrape_metadata) -> dict:
+    def _labeled_static_job_config(self, job, job_name_prefix, hosts, topology_labels) -> dict:
         """Construct labeled job configuration for a single job.
 
         Args:
@@ -520,9 +608,8 @@ class ProfilingEndpointConsumer(ops.Object):
                 the job if it does have a job name.
             hosts: a dictionary mapping host names to host address for
                 all units of the relation for which this job configuration must be constructed.
-            scrape_metadata: scrape configuration metadata obtained
-                from `ProfilingEndpointProvider` from the same relation for
-                which this job configuration is being constructed.
+            topology_labels: the Juju topology labels of the `ProfilingEndpointProvider` on
+                the same relation for which this job configuration is being constructed.
 
         Returns:
             A dictionary representing a Parca job configuration for a single job.
@@ -530,11 +617,8 @@ class ProfilingEndpointConsumer(ops.Object):
         name = job.get("job_name")
         job_name = "{}_{}".format(job_name_prefix, name) if name else job_name_prefix
 
-        labeled_job = job.copy()
-        labeled_job["job_name"] = job_name
-
         static_configs = job.get("static_configs")
-        labeled_job["static_configs"] = []
+        labeled_static_configs = []
 
         # relabel instance labels so that instance identifiers are globally unique
         # stable over unit recreation
@@ -555,51 +639,60 @@ class ProfilingEndpointConsumer(ops.Object):
             ports = []
             unitless_targets = []
             for target in all_targets:
-                host, port = target.split(":")
-                if host.strip() == "*":
-                    ports.append(port.strip())
-                else:
+                # only the first colon separates host and port, so that fully qualified targets
+                # such as IPv6 addresses are passed through untouched
+                host, sep, port = target.partition(":")
+                if host.strip() != "*":
                     unitless_targets.append(target)
+                elif ":" in port:
+                    logger.warning("skipping invalid scrape target %r", target)
+                elif sep:
+                    ports.append(port.strip())
+            # the same ports are shared, read-only, by the configs of every host below
+            ports = tuple(ports)
 
             # label scrape targets that do not have unit labels
             if unitless_targets:
                 unitless_config = self._labeled_unitless_config(
-                    unitless_targets, labels, scrape_metadata
+                    unitless_targets, labels, topology_labels
                 )
-                labeled_job["static_configs"].append(unitless_config)
+                labeled_static_configs.append(unitless_config)
 
             # label scrape targets that do have unit labels
             for host_name, host_address in hosts.items():
                 static_config = self._labeled_unit_config(
-                    host_name, host_address, ports, labels, scrape_metadata
+                    host_name, host_address, ports, labels, topology_labels
                 )
-                labeled_job["static_configs"].append(static_config)
-                if "juju_unit" not in instance_relabel_config["source_labels"]:
-                    instance_relabel_config["source_labels"].append("juju_unit")  # type: ignore
-
-        # ensure topology relabeling of instance label is last in order of relabelings
-        relabel_configs = job.get("relabel_configs", [])
-        relabel_configs.append(instance_relabel_config)
-        labeled_job["relabel_configs"] = relabel_configs
-        return labeled_job
+                labeled_static_configs.append(static_config)
+
+        # per-unit static configs were added above, so instances are also identified by unit
+        if hosts and static_configs:
+            instance_relabel_config["source_labels"].append("juju_unit")  # type: ignore
+
+        # ensure topology relabeling of instance label is last in order of relabelings; build a
+        # new list so that the (possibly cached) job passed in is left untouched
+        return {
+            **job,
+            "job_name": job_name,
+            "static_configs": labeled_static_configs,
+            "relabel_configs": [*job.get("relabel_configs", []), instance_relabel_config],
+        }
 
-    def _set_juju_labels(self, labels, scrape_metadata) -> dict:
+    def _set_juju_labels(self, labels, topology_labels) -> dict:
         """Create a copy of metric labels with Juju topology information.
 
         Args:
             labels: a dictionary containing Parca metric labels.
-            scrape_metadata: scrape related metadata provided by `ProfilingEndpointProvider`.
+            topology_labels: the Juju topology labels derived from the scrape metadata provided
+                by `ProfilingEndpointProvider`.
 
         Returns:
             a copy of the `labels` dictionary augmented with Juju topology information with the
             exception of unit name.
         """
-        juju_labels = labels.copy()  # deep copy not needed
-        juju_labels.update(ProviderTopology.from_dict(scrape_metadata).label_matcher_dict)
+        return {**labels, **topology_labels}  # deep copy not needed
 
-        return juju_labels
-
-    def _labeled_unitless_config(self, targets, labels, scrape_metadata) -> dict:
+    def _labeled_unitless_config(self, targets, labels, topology_labels) -> dict:
         """Return static scrape configuration for fully qualified host addresses.
 
         Fully qualified hosts are those scrape targets for which the address are specified by the
@@ -612,17 +705,17 @@ class ProfilingEndpointConsumer(ops.Object):
             targets: a list of addresses of fully qualified hosts.
             labels: labels specified by `ProfilingEndpointProvider` clients which are associated
                 with `targets`.
-            scrape_metadata: scrape related metadata provided by `ProfilingEndpointProvider`.
+            topology_labels: the Juju topology labels of the `ProfilingEndpointProvider`.
 
         Returns:
             A dict containing the static scrape configuration for a list of fully qualified hosts.
         """
-        juju_labels = self._set_juju_labels(labels, scrape_metadata)
+        juju_labels = self._set_juju_labels(labels, topology_labels)
         unitless_config = {"targets": targets, "labels": juju_labels}
         return unitless_config
 
     def _labeled_unit_config(
-        self, unit_name, host_address, ports, labels, scrape_metadata
+        self, unit_name, host_address, ports, labels, topology_labels
     ) -> dict:
         """Return static scrape configuration for a wildcard host.
 
@@ -633,28 +726,24 @@ class ProfilingEndpointConsumer(ops.Object):
         Args:
             unit_name: a string representing the unit name of the wildcard host.
             host_address: a string representing the address of the wildcard host.
-            ports: list of ports on which this wildcard host exposes its profiles.
+            ports: a sequence of ports on which this wildcard host exposes its profiles.
             labels: a dictionary of labels provided by `ProfilingEndpointProvider` intended to be
                 associated with this wildcard host.
-            scrape_metadata: scrape related metadata provided by `ProfilingEndpointProvider`.
+            topology_labels: the Juju topology labels of the `ProfilingEndpointProvider`.
 
         Returns:
             A dictionary containing the static scrape configuration
             for a single wildcard host.
         """
-        juju_labels = self._set_juju_labels(labels, scrape_metadata)
+        juju_labels = self._set_juju_labels(labels, topology_labels)
 
         juju_labels["juju_unit"] = unit_name
 
         static_config = {"labels": juju_labels}
 
-        if ports:
-            targets = []
-            for port in ports:
-                targets.append("{}:{}".format(host_address, port))
-            static_config["targets"] = targets  # type: ignore
-        else:
-            static_config["targets"] = [host_address]  # type: ignore
+        static_config["targets"] = (  # type: ignore
+            [f"{host_address}:{port}" for port in ports] if ports else [host_address]
+        )
 
         return static_config
 
@@ -727,12 +816,14 @@ class ProfilingEndpointProvider(ops.Object):
 
         self._charm = charm
         self._relation_name = relation_name
+        self._fqdn: Optional[str] = None
         # sanitize job configurations to the supported subset of parameters
         jobs = [] if jobs is None else jobs
         self._jobs = [_sanitize_scrape_configuration(job) for job in jobs]
 
         events = self._charm.on[self._relation_name]
-        self.framework.observe(events.relation_joined, self._publish_all_relation_data)
+        # relation_changed always follows relation_joined, so observing it alone is enough to
+        # publish to new relations without writing the same data twice
         self.framework.observe(events.relation_changed, self._publish_all_relation_data)
 
         if not refresh_event:
@@ -742,20 +833,18 @@ class ProfilingEndpointProvider(ops.Object):
                     refresh_event = [self._charm.on.update_status]
                 else:
                     # This is a sidecar/pebble charm
-                    container = list(self._charm.meta.containers.values())[0]
+                    container = next(iter(self._charm.meta.containers.values()))
                     refresh_event = [self._charm.on[container.name.replace("-", "_")].pebble_ready]
             else:
                 refresh_event = [self._charm.on.update_status]
-
-        else:
-            if not isinstance(refresh_event, list):
-                refresh_event = [refresh_event]
+        elif not isinstance(refresh_event, list):
+            refresh_event = [refresh_event]
 
         for ev in refresh_event:
             self.framework.observe(ev, self._set_unit_ip)
 
         self.framework.observe(self._charm.on.upgrade_charm, self._publish_all_relation_data)
-        # If there is no leader during relation_joined we will still need to set alert rules.
+        # If there is no leader when a relation is created we will still need to publish the data.
         self.framework.observe(self._charm.on.leader_elected, self._publish_all_relation_data)
 
     def update_scrape_job_spec(self, jobs):
@@ -773,9 +862,14 @@ class ProfilingEndpointProvider(ops.Object):
         if not self._charm.unit.is_leader():
             return
 
+        scrape_metadata = json.dumps(self._scrape_metadata)
+        scrape_jobs = json.dumps(self._scrape_jobs)
+
         for relation in self._charm.model.relations[self._relation_name]:
-            relation.data[self._charm.app]["scrape_metadata"] = json.dumps(self._scrape_metadata)
-            relation.data[self._charm.app]["scrape_jobs"] = json.dumps(self._scrape_jobs)
+            _update_relation_data(
+                relation.data[self._charm.app],
+                {"scrape_metadata": scrape_metadata, "scrape_jobs": scrape_jobs},
+            )
 
     def set_scrape_job_spec(self):
         """Ensure the scrape target information (as passed to this object on __init__) is published.
@@ -794,12 +888,25 @@ class ProfilingEndpointProvider(ops.Object):
         in the unit relation data for the Parca charm. The only argument specified is an event and
         it is ignored.
         """
-        for relation in self._charm.model.relations[self._relation_name]:
-            relation.data[self._charm.unit]["parca_scrape_unit_address"] = socket.getfqdn()
-            relation.data[self._charm.unit]["parca_scrape_unit_name"] = str(
-                self._charm.model.unit.name
+        relations = self._charm.model.relations[self._relation_name]
+        if not relations:
+            return
+
+        unit_address = self._get_fqdn()
+        unit_name = str(self._charm.model.unit.name)
+        for relation in relations:
+            _update_relation_data(
+                relation.data[self._charm.unit],
+                {"parca_scrape_unit_address": unit_address, "parca_scrape_unit_name": unit_name},
             )
 
+    def _get_fqdn(self) -> str:
+        """Get the unit FQDN; the lookup can be slow, so it is cached."""
+        if self._fqdn is None:
+            hostname = socket.gethostname()
+            self._fqdn = hostname if "." in hostname else socket.getfqdn(hostname)
+        return self._fqdn
+
     def _is_valid_unit_address(self, address: str) -> bool:
         """Validate a unit address.
 
@@ -837,7 +944,7 @@ class ProfilingEndpointProvider(ops.Object):
         """
         return self._jobs if self._jobs else [DEFAULT_JOB]
 
-    @property
+    @functools.cached_property
     def _scrape_metadata(self) -> dict:
         """Generate scrape metadata.
 
@@ -323,6 +323,7 @@ of Metrics provider charms hold eponymous information.
 """  # noqa: W505
 
 import copy
+import functools
 import hashlib
 import ipaddress
 import json
@@ -364,6 +365,8 @@ LIBAPI = 0
 # to 0 if you are raising the major API version
 LIBPATCH = 48
 
+# NOTE: forked locally from LIBPATCH 48; not listed in charm-libs (charmcraft.yaml).
+
 PYDEPS = ["cosl"]
 
 logger = logging.getLogger(__name__)
@@ -397,6 +400,9 @@ DEFAULT_JOB = {
 DEFAULT_RELATION_NAME = "metrics-endpoint"
 RELATION_INTERFACE_NAME = "prometheus_scrape"
 
+# every character that may appear in an IPv4 or IPv6 address without a scope id
+_IP_ADDRESS_CHARS = frozenset("0123456789abcdefABCDEF.:")
+
 DEFAULT_ALERT_RULES_RELATIVE_PATH = "./src/prometheus_alert_rules"
 
 
@@ -1295,6 +1301,18 @@ def _resolve_dir_against_charm_path(charm: CharmBase, *path_elements: str) -> st
     return str(alerts_dir_path)
 
 
+def _set_changed_keys(databag, data: Dict[str, str]):
+    """Set the keys in `data` that do not already hold the same value in `databag`.
+
+    The leader can read back its own application databag, and every unit its own unit databag,
+    so republishing unchanged data costs no relation-set calls, whichever ops release is used.
+    Setting a key to "" removes it, hence absent keys are compared as "".
+    """
+    changed = {key: value for key, value in data.items() if databag.get(key, "") != value}
+    if changed:
+        databag.update(changed)
+
+
 class MetricsEndpointProvider(Object):
     """A metrics endpoint for Prometheus."""
 
@@ -1460,6 +1478,7 @@ class MetricsEndpointProvider(Object):
             )
         self.external_url = external_url
         self._lookaside_jobs = lookaside_jobs_callable
+        self._fqdn: Optional[str] = None  # see _get_fqdn()
 
         events = self._charm.on[self._relation_name]
         self.framework.observe(events.relation_changed, self._on_relation_changed)
@@ -1473,7 +1492,7 @@ class MetricsEndpointProvider(Object):
                     refresh_event = [self._charm.on.update_status]
                 else:
                     # This is a sidecar/pebble charm
-                    container = list(self._charm.meta.containers.values())[0]
+                    container = next(iter(self._charm.meta.containers.values()))
                     refresh_event = [self._charm.on[container.name.replace("-", "_")].pebble_ready]
             else:
                 logger.warning(
@@ -1483,10 +1502,8 @@ class MetricsEndpointProvider(Object):
                     len(self._charm.meta.containers),
                 )
                 refresh_event = [self._charm.on.update_status]
-
-        else:
-            if not isinstance(refresh_event, list):
-                refresh_event = [refresh_event]
+        elif not isinstance(refresh_event, list):
+            refresh_event = [refresh_event]
 
         self.framework.observe(events.relation_joined, self.set_scrape_job_spec)
         for ev in refresh_event:
@@ -1533,15 +1550,24 @@ class MetricsEndpointProvider(Object):
         alert_rules.add_path(self._alert_rules_path, recursive=True)
         alert_rules_as_dict = alert_rules.as_dict()
 
-        for relation in self._charm.model.relations[self._relation_name]:
-            relation.data[self._charm.app]["scrape_metadata"] = json.dumps(self._scrape_metadata)
-            relation.data[self._charm.app]["scrape_jobs"] = json.dumps(self._scrape_jobs)
+        # identical for every relation
+        scrape_metadata = json.dumps(self._scrape_metadata)
+        scrape_jobs = json.dumps(self._scrape_jobs)
+        alert_rules_json = json.dumps(alert_rules_as_dict)
 
-            # Update relation data with the string representation of the rule file.
-            # Juju topology is already included in the "scrape_metadata" field above.
-            # The consumer side of the relation uses this information to name the rules file
-            # that is written to the filesystem.
-            relation.data[self._charm.app]["alert_rules"] = json.dumps(alert_rules_as_dict)
+        for relation in self._charm.model.relations[self._relation_name]:
+            # Only changed keys are written. "alert_rules" holds the string
+            # representation of the rule file; Juju topology is already included in the
+            # "scrape_metadata" field. The consumer side of the relation uses this information
+            # to name the rules file that is written to the filesystem.
+            _set_changed_keys(
+                relation.data[self._charm.app],
+                {
+                    "scrape_metadata": scrape_metadata,
+                    "scrape_jobs": scrape_jobs,
+                    "alert_rules": alert_rules_json,
+                },
+            )
 
     def _set_unit_ip(self, _=None):
         """Set unit host address.
@@ -1553,6 +1579,7 @@ class MetricsEndpointProvider(Object):
         to be able to use this method as an event handler, although no access to the
         event is actually needed.
         """
+        unit_name = str(self._charm.model.unit.name)
         for relation in self._charm.model.relations[self._relation_name]:
             unit_ip = str(self._charm.model.get_binding(relation).network.bind_address)
 
@@ -1566,15 +1593,26 @@ class MetricsEndpointProvider(Object):
                 unit_address = unit_ip
                 path = ""
             else:
-                unit_address = socket.getfqdn()
+                unit_address = self._get_fqdn()
                 path = ""
 
-            relation.data[self._charm.unit]["prometheus_scrape_unit_address"] = unit_address
-            relation.data[self._charm.unit]["prometheus_scrape_unit_path"] = path
-            relation.data[self._charm.unit]["prometheus_scrape_unit_name"] = str(
-                self._charm.model.unit.name
+            _set_changed_keys(
+                relation.data[self._charm.unit],
+                {
+                    "prometheus_scrape_unit_address": unit_address,
+                    "prometheus_scrape_unit_path": path,
+                    "prometheus_scrape_unit_name": unit_name,
+                },
             )
 
+    def _get_fqdn(self) -> str:
+        """Return the FQDN of this unit, looking it up on first use only."""
+        if self._fqdn is None:
+            hostname = socket.gethostname()
+            # already qualified, no reverse lookup needed
+            self._fqdn = hostname if "." in hostname else socket.getfqdn(hostname)
+        return self._fqdn
+
     def _is_valid_unit_address(self, address: str) -> bool:
         """Validate a unit address.
 
@@ -1584,6 +1622,10 @@ class MetricsEndpointProvider(Object):
         Args:
             address: a string representing a unit address
         """
+        # cheaply reject host names before paying for ipaddress parsing and its exception
+        if not address or ("%" not in address and not _IP_ADDRESS_CHARS.issuperset(address)):
+            return False
+
         try:
             _ = ipaddress.ip_address(address)
         except ValueError:
@@ -1604,7 +1646,7 @@ class MetricsEndpointProvider(Object):
             jobs.extend(PrometheusConfig.sanitize_scrape_configs(self._lookaside_jobs()))
         return jobs or [DEFAULT_JOB]
 
-    @property
+    @functools.cached_property
     def _scrape_metadata(self) -> dict:
         """Generate scrape metadata.
 
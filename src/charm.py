@@ -30,11 +30,17 @@ class ZincCharm(ops.CharmBase):
         self._container = self.unit.get_container("zinc")
         self._zinc = Zinc()
 
+        # Metrics and profiles are both served on the Zinc port of every unit, and the unit
+        # address is republished whenever the workload container (re)starts
+        scrape_jobs = [{"static_configs": [{"targets": [f"*:{self._zinc.port}"]}]}]
+        refresh_event = self.on.zinc_pebble_ready
+
         # Provide ability for Zinc to be scraped by Prometheus using prometheus_scrape
         self._scraping = MetricsEndpointProvider(
             self,
             relation_name="metrics-endpoint",
-            jobs=[{"static_configs": [{"targets": [f"*:{self._zinc.port}"]}]}],
+            jobs=scrape_jobs,
+            refresh_event=refresh_event,
         )
 
         # Enable log forwarding for Loki and other charms that implement loki_push_api
@@ -49,7 +55,7 @@ class ZincCharm(ops.CharmBase):
 
         # Enable profiling over a relation with Parca
         self._profiling = ProfilingEndpointProvider(
-            self, jobs=[{"static_configs": [{"targets": [f"*:{self._zinc.port}"]}]}]
+            self, jobs=scrape_jobs, refresh_event=refresh_event
         )
 
         self._ingress = IngressPerAppRequirer(
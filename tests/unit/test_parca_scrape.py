@@ -0,0 +1,248 @@
+# Copyright 2024 Jon Seager (@jnsgruk)
+# See LICENSE file for licensing details.
+
+import json
+import unittest
+from unittest.mock import ANY, patch
+
+import ops
+from charms.parca_k8s.v0.parca_scrape import ProfilingEndpointConsumer, ProfilingEndpointProvider
+from ops.testing import Harness
+
+METADATA = """
+name: parca
+requires:
+  profiling-endpoint:
+    interface: parca_scrape
+"""
+
+SCRAPE_METADATA = {
+    "model": "test",
+    "model_uuid": "12345678-1234-4234-8234-123456789abc",
+    "application": "zinc",
+    "unit": "zinc/0",
+    "charm_name": "zinc-k8s",
+}
+
+PROVIDER_METADATA = """
+name: zinc
+provides:
+  profiling-endpoint:
+    interface: parca_scrape
+"""
+
+JOBS = [{"static_configs": [{"targets": ["*:4080"]}]}]
+
+
+class ConsumerCharm(ops.CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.consumer = ProfilingEndpointConsumer(self)
+
+
+class ProviderCharm(ops.CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.provider = ProfilingEndpointProvider(self, jobs=JOBS)
+
+
+class TestProfilingEndpointConsumer(unittest.TestCase):
+    def setUp(self):
+        self.harness = Harness(ConsumerCharm, meta=METADATA)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.begin()
+
+    def _add_provider(self, jobs, app="zinc", units=1) -> int:
+        rel_id = self.harness.add_relation(
+            "profiling-endpoint",
+            app,
+            app_data={
+                "scrape_jobs": json.dumps(jobs),
+                "scrape_metadata": json.dumps({**SCRAPE_METADATA, "application": app}),
+            },
+        )
+        for i in range(units):
+            self.harness.add_relation_unit(rel_id, f"{app}/{i}")
+            self.harness.update_relation_data(
+                rel_id, f"{app}/{i}", {"parca_scrape_unit_address": f"{app}-{i}.local"}
+            )
+        return rel_id
+
+    def test_jobs_are_not_shared_between_calls(self):
+        self._add_provider([{"static_configs": [{"targets": ["*:4080"]}]}])
+        jobs = self.harness.charm.consumer.jobs()
+        jobs[0]["job_name"] = "MUTATED"
+        jobs[0]["static_configs"].append({"targets": ["foo:1"]})
+
+        jobs = self.harness.charm.consumer.jobs()
+        self.assertEqual(jobs[0]["job_name"], "test_12345678_zinc")
+        self.assertEqual(len(jobs[0]["static_configs"]), 1)
+
+    def test_unlabeled_jobs_are_not_shared_between_calls(self):
+        rel_id = self.harness.add_relation(
+            "profiling-endpoint",
+            "zinc",
+            app_data={"scrape_jobs": json.dumps([{"static_configs": [{"targets": ["a:1"]}]}])},
+        )
+        self.harness.add_relation_unit(rel_id, "zinc/0")
+        self.harness.charm.consumer.jobs()[0]["static_configs"].clear()
+        self.assertEqual(
+            self.harness.charm.consumer.jobs(), [{"static_configs": [{"targets": ["a:1"]}]}]
+        )
+
+    def test_departed_unit_is_dropped_from_cached_jobs(self):
+        rel_id = self._add_provider([{"static_configs": [{"targets": ["*:4080"]}]}], units=2)
+        consumer = self.harness.charm.consumer
+        self.assertEqual(len(consumer.jobs()[0]["static_configs"]), 2)
+
+        self.harness.remove_relation_unit(rel_id, "zinc/1")
+        static_configs = consumer.jobs()[0]["static_configs"]
+        self.assertEqual(static_configs[0]["targets"], ["zinc-0.local:4080"])
+        self.assertEqual(len(static_configs), 1)
+
+    def test_unchanged_relation_data_is_not_parsed_again(self):
+        self._add_provider([{"static_configs": [{"targets": ["*:4080"]}]}])
+        consumer = self.harness.charm.consumer
+        jobs = consumer.jobs()
+        with patch("json.loads", wraps=json.loads) as loads:
+            self.assertEqual(consumer.jobs(), jobs)
+        loads.assert_not_called()
+
+    def test_non_scalar_scrape_metadata_is_tolerated(self):
+        rel_id = self.harness.add_relation(
+            "profiling-endpoint",
+            "zinc",
+            app_data={
+                "scrape_jobs": json.dumps([{"static_configs": [{"targets": ["*:4080"]}]}]),
+                "scrape_metadata": json.dumps({**SCRAPE_METADATA, "extra": ["x"]}),
+            },
+        )
+        self.harness.add_relation_unit(rel_id, "zinc/0")
+        self.harness.update_relation_data(
+            rel_id, "zinc/0", {"parca_scrape_unit_address": "zinc-0.local"}
+        )
+        labels = self.harness.charm.consumer.jobs()[0]["static_configs"][0]["labels"]
+        self.assertEqual(labels["juju_application"], "zinc")
+        self.assertEqual(labels["juju_unit"], "zinc/0")
+
+    def test_duplicate_job_names_are_skipped(self):
+        self._add_provider(
+            [
+                {"job_name": "a", "static_configs": [{"targets": ["*:1"]}]},
+                {"job_name": "a", "static_configs": [{"targets": ["*:2"]}]},
+                {"static_configs": [{"targets": ["*:3"]}]},
+                {"static_configs": [{"targets": ["*:4"]}]},
+            ]
+        )
+        with self.assertLogs("charms.parca_k8s.v0.parca_scrape", "WARNING") as logs:
+            jobs = self.harness.charm.consumer.jobs()
+
+        self.assertEqual(
+            [job["job_name"] for job in jobs], ["test_12345678_zinc_a", "test_12345678_zinc"]
+        )
+        self.assertEqual(jobs[0]["static_configs"][0]["targets"], ["zinc-0.local:1"])
+        self.assertEqual(jobs[1]["static_configs"][0]["targets"], ["zinc-0.local:3"])
+        self.assertEqual(len(logs.records), 2)
+
+    def test_same_job_name_from_different_providers_is_kept(self):
+        self._add_provider([{"job_name": "a", "static_configs": [{"targets": ["*:1"]}]}])
+        self._add_provider(
+            [{"job_name": "a", "static_configs": [{"targets": ["*:1"]}]}], app="other"
+        )
+        jobs = self.harness.charm.consumer.jobs()
+        self.assertEqual(
+            sorted(job["job_name"] for job in jobs),
+            ["test_12345678_other_a", "test_12345678_zinc_a"],
+        )
+
+    def test_iter_jobs_matches_jobs(self):
+        self._add_provider(
+            [
+                {"job_name": "a", "static_configs": [{"targets": ["*:1", "10.0.0.1:2"]}]},
+                {"static_configs": [{"targets": ["*:3"]}]},
+            ],
+            units=2,
+        )
+        self._add_provider([{"static_configs": [{"targets": ["*:4"]}]}], app="other")
+        consumer = self.harness.charm.consumer
+        self.assertEqual(list(consumer.iter_jobs()), consumer.jobs())
+        self.assertEqual(len(consumer.jobs()), 3)
+
+    def _static_configs(self, targets) -> list:
+        self._add_provider([{"static_configs": [{"targets": targets}]}])
+        return self.harness.charm.consumer.jobs()[0]["static_configs"]
+
+    def test_wildcard_target_with_port(self):
+        static_configs = self._static_configs(["* : 80"])
+        self.assertEqual(static_configs, [{"labels": ANY, "targets": ["zinc-0.local:80"]}])
+
+    def test_bare_wildcard_target_uses_unit_address_without_port(self):
+        static_configs = self._static_configs(["*"])
+        self.assertEqual(static_configs[0]["targets"], ["zinc-0.local"])
+
+    def test_wildcard_target_with_invalid_port_is_skipped(self):
+        with self.assertLogs("charms.parca_k8s.v0.parca_scrape", "WARNING") as logs:
+            static_configs = self._static_configs(["*:80:90", "*:80"])
+        self.assertEqual(static_configs[0]["targets"], ["zinc-0.local:80"])
+        self.assertIn("'*:80:90'", logs.output[0])
+
+    def test_fully_qualified_targets_are_passed_through(self):
+        static_configs = self._static_configs(["[::1]:80", "example.com"])
+        self.assertEqual(static_configs[0]["targets"], ["[::1]:80", "example.com"])
+        self.assertNotIn("juju_unit", static_configs[0]["labels"])
+        # units still get a config of their own, addressed without a port
+        self.assertEqual(static_configs[1]["targets"], ["zinc-0.local"])
+
+
+@patch("socket.getfqdn", lambda host: f"{host}.local")
+@patch("socket.gethostname", lambda: "zinc-0")
+class TestProfilingEndpointProvider(unittest.TestCase):
+    def setUp(self):
+        self.harness = Harness(ProviderCharm, meta=PROVIDER_METADATA)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.set_leader(True)
+        self.harness.begin()
+
+    def test_new_relation_is_published_to_on_relation_changed(self):
+        rel_id = self.harness.add_relation("profiling-endpoint", "parca")
+        self.harness.add_relation_unit(rel_id, "parca/0")
+        # relation_joined is no longer observed, so nothing is published until relation_changed
+        self.assertEqual(self.harness.get_relation_data(rel_id, "zinc"), {})
+        self.harness.update_relation_data(rel_id, "parca/0", {"foo": "bar"})
+
+        app_data = self.harness.get_relation_data(rel_id, "zinc")
+        self.assertEqual(
+            json.loads(app_data["scrape_jobs"])[0]["static_configs"], JOBS[0]["static_configs"]
+        )
+        self.assertEqual(json.loads(app_data["scrape_metadata"])["application"], "zinc")
+        unit_data = self.harness.get_relation_data(rel_id, "zinc/0")
+        self.assertEqual(unit_data["parca_scrape_unit_address"], "zinc-0.local")
+        self.assertEqual(unit_data["parca_scrape_unit_name"], "zinc/0")
+
+    def test_bare_host_name_is_qualified_once(self):
+        provider = self.harness.charm.provider
+        with patch("socket.getfqdn", return_value="zinc-0.zinc-endpoints.local") as getfqdn:
+            self.assertEqual(provider._get_fqdn(), "zinc-0.zinc-endpoints.local")
+            self.assertEqual(provider._get_fqdn(), "zinc-0.zinc-endpoints.local")
+        getfqdn.assert_called_once_with("zinc-0")
+
+    def test_dotted_host_name_skips_getfqdn(self):
+        provider = self.harness.charm.provider
+        with (
+            patch("socket.gethostname", return_value="zinc-0.example.com"),
+            patch("socket.getfqdn") as getfqdn,
+        ):
+            self.assertEqual(provider._get_fqdn(), "zinc-0.example.com")
+        getfqdn.assert_not_called()
+
+    def test_unchanged_data_is_not_written_again(self):
+        rel_id = self.harness.add_relation("profiling-endpoint", "parca")
+        self.harness.add_relation_unit(rel_id, "parca/0")
+        self.harness.update_relation_data(rel_id, "parca/0", {"foo": "bar"})
+
+        backend = self.harness.charm.model._backend
+        with patch.object(
+            backend, "update_relation_data", wraps=backend.update_relation_data
+        ) as update_relation_data:
+            self.harness.charm.provider.set_scrape_job_spec()
+        update_relation_data.assert_not_called()
@@ -0,0 +1,108 @@
+# Copyright 2024 Jon Seager (@jnsgruk)
+# See LICENSE file for licensing details.
+
+import ipaddress
+import json
+import unittest
+from unittest.mock import patch
+
+import ops
+from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
+from ops.testing import Harness
+
+METADATA = """
+name: provider
+provides:
+  metrics-endpoint:
+    interface: prometheus_scrape
+"""
+
+JOBS = [{"static_configs": [{"targets": ["*:4080"]}]}]
+
+
+class ProviderCharm(ops.CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.provider = MetricsEndpointProvider(self, jobs=JOBS)
+
+
+class TestMetricsEndpointProvider(unittest.TestCase):
+    def setUp(self):
+        self.harness = Harness(ProviderCharm, meta=METADATA)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.set_leader(True)
+        self.harness.begin()
+
+    def test_scrape_job_spec_is_published_to_every_relation(self):
+        rel_ids = [self.harness.add_relation("metrics-endpoint", app) for app in ("prom", "other")]
+        self.harness.charm.provider.set_scrape_job_spec()
+
+        for rel_id in rel_ids:
+            app_data = self.harness.get_relation_data(rel_id, "provider")
+            self.assertEqual(sorted(app_data), ["alert_rules", "scrape_jobs", "scrape_metadata"])
+            scrape_jobs = json.loads(app_data["scrape_jobs"])
+            self.assertEqual(scrape_jobs[0]["static_configs"], JOBS[0]["static_configs"])
+            self.assertEqual(json.loads(app_data["scrape_metadata"])["application"], "provider")
+
+    def test_unchanged_data_is_not_written_again(self):
+        self.harness.add_relation("metrics-endpoint", "prom")
+        provider = self.harness.charm.provider
+        provider.set_scrape_job_spec()
+
+        backend = self.harness.charm.model._backend
+        with patch.object(
+            backend, "update_relation_data", wraps=backend.update_relation_data
+        ) as update_relation_data:
+            provider.set_scrape_job_spec()
+        update_relation_data.assert_not_called()
+
+        with patch.object(
+            backend, "update_relation_data", wraps=backend.update_relation_data
+        ) as update_relation_data:
+            provider.update_scrape_job_spec([{"static_configs": [{"targets": ["*:8080"]}]}])
+        # only the scrape jobs changed
+        update_relation_data.assert_called_once()
+
+    def test_unit_address_validation_matches_ipaddress(self):
+        provider = self.harness.charm.provider
+        cases = {
+            "10.1.2.3": True,
+            "2001:DB8::1": True,
+            "fe80::1%eth0": True,
+            "zinc-0.zinc-endpoints.test.svc.cluster.local": False,
+            "": False,
+            # bind_address is stringified, so a missing address arrives as "None"
+            "None": False,
+        }
+        for address, valid in cases.items():
+            with self.subTest(address=address):
+                self.assertEqual(provider._is_valid_unit_address(address), valid)
+                self.assertEqual(valid, self._parses_as_ip(address))
+
+    @staticmethod
+    def _parses_as_ip(address) -> bool:
+        try:
+            ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return True
+
+    def test_fqdn_is_looked_up_once_per_provider(self):
+        provider = self.harness.charm.provider
+        with (
+            patch("socket.gethostname", return_value="provider-0") as gethostname,
+            patch("socket.getfqdn", return_value="provider-0.provider-endpoints") as getfqdn,
+        ):
+            self.assertEqual(provider._get_fqdn(), "provider-0.provider-endpoints")
+            self.assertEqual(provider._get_fqdn(), "provider-0.provider-endpoints")
+        gethostname.assert_called_once()
+        getfqdn.assert_called_once_with("provider-0")
+
+    def test_dotted_host_name_is_used_as_is(self):
+        provider = self.harness.charm.provider
+        with (
+            patch("socket.gethostname", return_value="provider-0.example.com"),
+            patch("socket.getfqdn") as getfqdn,
+        ):
+            self.assertEqual(provider._get_fqdn(), "provider-0.example.com")
+        getfqdn.assert_not_called()